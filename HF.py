@@ -12,18 +12,51 @@
 
 import numpy as np
 import math
-
-# import scipy.special as sp # uncomment this module for use of special functions such as erf(t)
-
-
-def MAIN():
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import repeat
+from numba import njit
+
+# The coefficients and exponents of primitive Gaussian functions for three levels
+# of STO-nG (n =1,2,3) with Zeta = 1.0; row N-1 holds the STO-NG contraction
+COEFFT = np.array(
+    [
+        [1.00000, 0.0000000, 0.000000],
+        [0.678914, 0.430129, 0.000000],
+        [0.444635, 0.535328, 0.154329],
+    ]
+)
+COEFFT.setflags(write=False)
+
+EXPONT = np.array(
+    [
+        [0.270950, 0.000000, 0.000000],
+        [0.151623, 0.851819, 0.000000],
+        [0.109818, 0.405771, 2.227660],
+    ]
+)
+EXPONT.setflags(write=False)
+
+# pi^(5/2) in the prefactor of the two-electron integrals
+PI_2_5 = math.pi ** 2 * math.sqrt(math.pi)
+
+
+def MAIN(R_array=None):
+    ## R_array is an optional array of bond distances for a potential energy surface scan
     N = 3
     Z_H = 1
     Z_He = 2
     R = 1.4632
-    Zeta1 = 2.0925
-    Zeta2 = 1.24
-    HFCALC(N, R, Zeta1, Zeta2, Z_H, Z_He)
+    Zeta1 = 1.24  # Slater exponent of H 1s
+    Zeta2 = 2.0925  # Slater exponent of He 1s
+    if R_array is None:
+        HFCALC(N, R, Zeta1, Zeta2, Z_H, Z_He)
+    else:
+        Energies = PES_SCAN(N, R_array, Zeta1, Zeta2, Z_H, Z_He)
+        print("   R          Total energy")
+        for R, EnergyTotal in zip(R_array, Energies):
+            print(f"{R:8.4f}   {EnergyTotal:.12f}")
 
 
 #########################
@@ -33,6 +66,13 @@ def MAIN():
 ##### One-electron integrals: overlap integrals#####
 
 
+@njit(
+    "float64(float64, float64, float64)",
+    cache=True,
+    fastmath=True,
+    boundscheck=False,
+    inline="always",
+)
 def OverLap_S_int(Alpha, Beta, R2_ab):
     ## Alpha and Beta are the exponents of primitive Gaussian functions
     ## R2_ab is the square of distance between two Gaussian functions
@@ -41,32 +81,56 @@ def OverLap_S_int(Alpha, Beta, R2_ab):
     Calculate the overlap integrals between two gaussian funtions 
 
     """
-    return (np.pi / (Alpha + Beta) ** 1.5) * np.exp(
-        (-Alpha * Beta / (Alpha + Beta) * R2_ab)
-    )
+    p = Alpha + Beta
+    return (math.pi / (p * math.sqrt(p))) * math.exp(-Alpha * Beta / p * R2_ab)
 
 
+@njit(
+    "float64(float64, float64, float64)",
+    cache=True,
+    fastmath=True,
+    boundscheck=False,
+    inline="always",
+)
 def Kinetic_T_int(Alpha, Beta, R2_ab):
     ## All variables are the same as in overlap integral functions
 
     """
     Calculate the kinetic integrals of electrons 
     """
+    p = Alpha + Beta
+    mu = Alpha * Beta / p
 
-    return (
-        Alpha
-        * Beta
-        / (Alpha + Beta)
-        * (
-            3.0
-            - (2.0 * Alpha * Beta / (Alpha + Beta) * R2_ab)
-            * np.pi
-            / (Alpha + Beta) ** 1.5
-            * np.exp(-Alpha * Beta * R2_ab / (Alpha + Beta))
-        )
+    return mu * (
+        3.0 - (2.0 * mu * R2_ab) * math.pi / (p * math.sqrt(p)) * math.exp(-mu * R2_ab)
     )
 
 
+#### Define Functions used to calculate Potential and two-electron integrals######
+
+
+@njit("float64(float64)", cache=True, fastmath=True, boundscheck=False, inline="always")
+def F0(t):
+    """
+    F function for calculation of potential integrals and two-electron integrals
+    """
+
+    if t < 1e-6:  ## Short Taylor expansion of F0 for the case of too small t
+        return 1.0 - t * (1.0 / 3.0 - t * 0.1)
+    elif t > 36.0:  ## erfc(sqrt(t)) < 2.2e-17 is below double precision: asymptote
+        return 0.5 * math.sqrt(math.pi / t)
+    else:
+        x = math.sqrt(t)
+        return 0.5 * math.sqrt(math.pi) / x * math.erf(x)
+
+
+@njit(
+    "float64(float64, float64, float64, float64, float64)",
+    cache=True,
+    fastmath=True,
+    boundscheck=False,
+    inline="always",
+)
 def Potential_V_int(Alpha, Beta, Zc, R2_ab, R2_pc):
     """
     Calculate the potential integrals of electrons caused by nuclei of atoms
@@ -74,60 +138,69 @@ def Potential_V_int(Alpha, Beta, Zc, R2_ab, R2_pc):
     ## All variables are defined as in the overlap integral function
     ## R2_pc is the square of distance from a product Gaussian function generated by
     # two Gaussian functions to one of the original ones
+    p = Alpha + Beta
 
-    return (
-        -2.0
-        * np.pi
-        / (Alpha + Beta)
-        * Zc
-        * np.exp(-Alpha * Beta * R2_ab / (Alpha + Beta))
-        * F0((Alpha + Beta) * R2_pc)
-    )
+    return -2.0 * math.pi / p * Zc * math.exp(-Alpha * Beta * R2_ab / p) * F0(p * R2_pc)
 
 
-#### Define Functions used to calculate Potential and two-electron integrals######
-
-
-def F0(t):
+@njit(
+    "float64(float64, float64, float64, float64)",
+    cache=True,
+    fastmath=True,
+    boundscheck=False,
+    inline="always",
+)
+def TwoE_int_Pair(p, q, K_pq, R2_pq):
     """
-    F function for calculation of potential integrals and two-electron integrals
+    Calculate two electron integrals from the exponent sums of two product Gaussian functions
     """
+    ## p and q are the exponent sums of the product Gaussian functions (ab| and |cd)
+    ## K_pq is the product of their exponential prefactors, possibly weighted by coefficients
 
-    if t < 1e-6:  ## Approximate value of F0 for the case of too small t
-        return 1.0 - t / 3.0
-    else:
-        return 0.5 * (np.pi / t) ** 0.5 * erf(t ** 0.5)
+    return (
+        2.0 * PI_2_5 / (p * q * math.sqrt(p + q)) * K_pq * F0(p * q * R2_pq / (p + q))
+    )
 
 
-def erf(t):
-    """ 
-    Numerical approximation of the error function to 3e-7
+@njit(cache=True, fastmath=True, boundscheck=False)
+def Pair_Tables(N, Exp_a, Coe_a, Exp_b, Coe_b, R_ab):
+    """
+    Tabulate the product Gaussian functions of all pairs of primitives on two centers
     """
-    P = 0.3275911
-    A = [0.254829592, -0.284496736, 1.421413741, -1.453152027, 1.061405429]
-    T = 1.0 / (1 + P * t)
-    Polynomial = 0.0
-    for i in range(5):
-        Polynomial = Polynomial + A[i] * np.power(T, i + 1)
-    return 1.0 - Polynomial * np.exp(-t * t)
+    ## The pairs (i,j) are flattened to index i*N + j; for each pair P holds the exponent sum,
+    # D the contraction coefficients times the exponential prefactor, and R_pb the distance
+    # between the center of the product Gaussian function and center b
+
+    P = np.empty(N * N)
+    D = np.empty(N * N)
+    R_pb = np.empty(N * N)
+    for i in range(N):
+        for j in range(N):
+            p = Exp_a[i] + Exp_b[j]
+            P[i * N + j] = p
+            D[i * N + j] = (
+                Coe_a[i] * Coe_b[j] * math.exp(-Exp_a[i] * Exp_b[j] * R_ab * R_ab / p)
+            )
+            R_pb[i * N + j] = Exp_a[i] * R_ab / p
+    return P, D, R_pb
 
 
-def TwoE_int(Alpha, Beta, Gamma, Delta, R2_ab, R2_cd, R2_pq):
+@njit(cache=True, fastmath=True, boundscheck=False)
+def Packed_Pair_Tables(N, Exp_a, Coe_a):
     """
-    Calculate two electron integrals
+    Tabulate the product Gaussian functions of the unique pairs of primitives on one center
     """
-    ## Alpha, Beta, Gamma, and Delta are exponents of primitive Gaussian functions
+    ## Only pairs i >= j are kept; D of the off-diagonal pairs is doubled for (ij) = (ji)
 
-    return (
-        2.0
-        * np.pi ** 2.5
-        / ((Alpha + Beta) * (Gamma + Delta) * np.sqrt(Alpha + Beta + Gamma + Delta))
-        * np.exp(
-            -Alpha * Beta * R2_ab / (Alpha + Beta)
-            - Gamma * Delta * R2_cd / (Gamma + Delta)
-        )
-        * F0((Alpha + Beta) * (Gamma + Delta) * R2_pq / (Alpha + Beta + Gamma + Delta))
-    )
+    P = np.empty(N * (N + 1) // 2)
+    D = np.empty(N * (N + 1) // 2)
+    ij = 0
+    for i in range(N):
+        for j in range(i + 1):
+            P[ij] = Exp_a[i] + Exp_a[j]
+            D[ij] = Coe_a[i] * Coe_a[j] * (1.0 if i == j else 2.0)
+            ij += 1
+    return P, D
 
 
 ### Calculate electron integrals in terms of basis functions which are linear combinations
@@ -141,6 +214,26 @@ def AO_Integral(N, R, Zeta1, Zeta2, Z_H, Z_He):
     ## N is the level of STO-nG; Zeta1 and Zeta2 are the exponents of Slater Orbitals
     # of H and He; Za and Zb are the atomic number of H and He
 
+    # Construct the contracted Gaussian functions for each atoms scaling up with its Slater exponent
+    # Row i of Prim holds the exponents and coefficients of primitive i as [Exp_H1s, Coe_H1s, Exp_He1s, Coe_He1s]
+    Prim = np.empty((N, 4))
+    Prim[:, 0] = EXPONT[N - 1, :N] * (Zeta1 ** 2)
+    Prim[:, 1] = COEFFT[N - 1, :N] * ((2.0 * Prim[:, 0] / np.pi) ** 0.75)
+    Prim[:, 2] = EXPONT[N - 1, :N] * (Zeta2 ** 2)
+    Prim[:, 3] = COEFFT[N - 1, :N] * ((2.0 * Prim[:, 2] / np.pi) ** 0.75)
+
+    # Calculate AO integrals by summation of all primitive Gaussian integrals
+    return AO_Integral_Kernel(N, R, Prim, Z_H, Z_He)
+
+
+@njit(cache=True, fastmath=True, boundscheck=False)
+def AO_Integral_Kernel(N, R, Prim, Z_H, Z_He):
+    """
+    Sum the primitive Gaussian integrals into integrals of basis functions (AOs)
+    """
+    ## Prim is an (N,4) array whose row i holds the exponent and contraction coefficient
+    # of the STO-nG primitive i on H and on He: [Exp_H1s, Coe_H1s, Exp_He1s, Coe_He1s]
+
     (
         S12,
         T11,
@@ -161,218 +254,96 @@ def AO_Integral(N, R, Zeta1, Zeta2, Z_H, Z_He):
     ) = (0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
     R2 = R * R
 
-    # The coefficients and exponents of primitive Gaussian functions for three levels
-    # of STO-nG (n =1,2,3) with Zeta = 1.0
-    Coefft = np.array(
-        [
-            [1.00000, 0.0000000, 0.000000],
-            [0.678914, 0.430129, 0.000000],
-            [0.444635, 0.535328, 0.154329],
-        ]
+    # Tabulate the product Gaussian functions of all pairs of primitives once; they are shared
+    # by the one-electron and two-electron integrals
+    # Pairs on one center are packed with (ij) = (ji)
+    P_HH, D_HH = Packed_Pair_Tables(N, Prim[:, 0], Prim[:, 1])
+    P_HeHe, D_HeHe = Packed_Pair_Tables(N, Prim[:, 2], Prim[:, 3])
+    P_HeH, D_HeH, R_pH = Pair_Tables(
+        N, Prim[:, 2], Prim[:, 3], Prim[:, 0], Prim[:, 1], R
     )
 
-    Expont = np.array(
-        [
-            [0.270950, 0.000000, 0.000000],
-            [0.151623, 0.851819, 0.000000],
-            [0.109818, 0.405771, 2.227660],
-        ]
-    )
-
-    # Generate coefficients and exponents of the STO-nG for two atoms H and He
-    Coe_H1s = np.zeros(3)
-    Exp_H1s = np.zeros(3)
-    Coe_He1s = np.zeros(3)
-    Exp_He1s = np.zeros(3)
-
-    # Construct the contracted Gaussian functions for each atoms scaling up with its Slater exponent
-    for i in range(N):
-        Exp_H1s[i] = Expont[N - 1, i] * (Zeta1 ** 2)
-        Exp_He1s[i] = Expont[N - 1, i] * (Zeta2 ** 2)
-        Coe_H1s[i] = Coefft[N - 1, i] * ((2.0 * Exp_H1s[i] / np.pi) ** 0.75)
-        Coe_He1s[i] = Coefft[N - 1, i] * ((2.0 * Exp_He1s[i] / np.pi) ** 0.75)
-
-    # Calculate AO integrals by summation of all primitive Gaussian integrals
-
     for i in range(N):
+        Exp_H_i, Coe_H_i, Exp_He_i, Coe_He_i = Prim[i]
         for j in range(N):
-            # Calculate the distance between center P of the product Gaussian function and centers
-            # A and B of the original primitive ones
-            R_ap = Exp_He1s[j] * R / (Exp_H1s[i] + Exp_He1s[j])
-            R2_ap = R_ap ** 2
-            R2_bp = (R - R_ap) ** 2
+            Exp_H_j, Coe_H_j, Exp_He_j, Coe_He_j = Prim[j]
+
+            # The distance between center P of the product Gaussian function and centers
+            # A and B of the original primitive ones is taken from the pair table
+            R_ap = R_pH[j * N + i]
+            R2_ap = R_ap * R_ap
+            R2_bp = (R - R_ap) * (R - R_ap)
 
             # Calculate accumulative integrals between AOs (linear combination of primitive Gaussian functions)
-            S12 = (
-                S12
-                + OverLap_S_int(Exp_H1s[i], Exp_He1s[j], R2) * Coe_H1s[i] * Coe_He1s[j]
-            )
-            T11 = (
-                T11
-                + Kinetic_T_int(Exp_H1s[i], Exp_H1s[j], 0.0) * Coe_H1s[i] * Coe_H1s[j]
-            )
-            T12 = (
-                T12
-                + Kinetic_T_int(Exp_H1s[i], Exp_He1s[j], R2) * Coe_H1s[i] * Coe_He1s[j]
-            )
-            T22 = (
-                T22
-                + Kinetic_T_int(Exp_He1s[i], Exp_He1s[j], 0.0)
-                * Coe_He1s[i]
-                * Coe_He1s[j]
-            )
+            S12 = S12 + OverLap_S_int(Exp_H_i, Exp_He_j, R2) * Coe_H_i * Coe_He_j
+            T11 = T11 + Kinetic_T_int(Exp_H_i, Exp_H_j, 0.0) * Coe_H_i * Coe_H_j
+            T12 = T12 + Kinetic_T_int(Exp_H_i, Exp_He_j, R2) * Coe_H_i * Coe_He_j
+            T22 = T22 + Kinetic_T_int(Exp_He_i, Exp_He_j, 0.0) * Coe_He_i * Coe_He_j
 
             # Z_H and Z_He are atomic numbers of H and He provided from the input
             V11H = (
                 V11H
-                + Potential_V_int(Exp_H1s[i], Exp_H1s[j], Z_H, 0.0, 0.00)
-                * Coe_H1s[i]
-                * Coe_H1s[j]
+                + Potential_V_int(Exp_H_i, Exp_H_j, Z_H, 0.0, 0.00) * Coe_H_i * Coe_H_j
             )
             V12H = (
                 V12H
-                + Potential_V_int(Exp_H1s[i], Exp_He1s[j], Z_H, R2, R2_ap)
-                * Coe_H1s[i]
-                * Coe_He1s[j]
+                + Potential_V_int(Exp_H_i, Exp_He_j, Z_H, R2, R2_ap)
+                * Coe_H_i
+                * Coe_He_j
             )
             V22H = (
                 V22H
-                + Potential_V_int(Exp_He1s[i], Exp_He1s[j], Z_H, 0.0, R2)
-                * Coe_He1s[i]
-                * Coe_He1s[j]
+                + Potential_V_int(Exp_He_i, Exp_He_j, Z_H, 0.0, R2)
+                * Coe_He_i
+                * Coe_He_j
             )
 
             V11He = (
                 V11He
-                + Potential_V_int(Exp_H1s[i], Exp_H1s[j], Z_He, 0.0, R2)
-                * Coe_H1s[i]
-                * Coe_H1s[j]
+                + Potential_V_int(Exp_H_i, Exp_H_j, Z_He, 0.0, R2) * Coe_H_i * Coe_H_j
             )
             V12He = (
                 V12He
-                + Potential_V_int(Exp_H1s[i], Exp_He1s[j], Z_He, R2, R2_bp)
-                * Coe_H1s[i]
-                * Coe_He1s[j]
+                + Potential_V_int(Exp_H_i, Exp_He_j, Z_He, R2, R2_bp)
+                * Coe_H_i
+                * Coe_He_j
             )
             V22He = (
                 V22He
-                + Potential_V_int(Exp_He1s[i], Exp_He1s[j], Z_He, 0.0, 0.0)
-                * Coe_He1s[i]
-                * Coe_He1s[j]
+                + Potential_V_int(Exp_He_i, Exp_He_j, Z_He, 0.0, 0.0)
+                * Coe_He_i
+                * Coe_He_j
             )
 
     # Calculate two-electron integrals using AOs which are linear combinations of primitive Gaussian functions
-    for i in range(N):
-        for j in range(N):
-            for k in range(N):
-                for l in range(N):
-                    R_ap = Exp_He1s[i] * R / (Exp_He1s[i] + Exp_H1s[j])
-                    R_bp = R - R_ap
-                    R_aq = Exp_He1s[k] * R / (Exp_He1s[k] + Exp_H1s[l])
-                    R_bq = R - R_aq
-                    R2_ap = R_ap ** 2
-                    R2_bp = R_bp ** 2
-                    R2_aq = R_aq * R_aq
-                    R2_bq = R_bq * R_bq
-                    R_pq = R_ap - R_aq
-                    R2_pq = R_pq * R_pq
-
-                    V1111 = (
-                        V1111
-                        + TwoE_int(
-                            Exp_H1s[i],
-                            Exp_H1s[j],
-                            Exp_H1s[k],
-                            Exp_H1s[l],
-                            0.0,
-                            0.0,
-                            0.0,
-                        )
-                        * Coe_H1s[i]
-                        * Coe_H1s[j]
-                        * Coe_H1s[k]
-                        * Coe_H1s[l]
-                    )
-                    V2111 = (
-                        V2111
-                        + TwoE_int(
-                            Exp_He1s[i],
-                            Exp_H1s[j],
-                            Exp_H1s[k],
-                            Exp_H1s[l],
-                            R2,
-                            0.0,
-                            R2_ap,
-                        )
-                        * Coe_He1s[i]
-                        * Coe_H1s[j]
-                        * Coe_H1s[k]
-                        * Coe_H1s[l]
-                    )
-                    V2121 = (
-                        V2121
-                        + TwoE_int(
-                            Exp_He1s[i],
-                            Exp_H1s[j],
-                            Exp_He1s[k],
-                            Exp_H1s[l],
-                            R2,
-                            R2,
-                            R2_pq,
-                        )
-                        * Coe_He1s[i]
-                        * Coe_H1s[j]
-                        * Coe_He1s[k]
-                        * Coe_H1s[l]
-                    )
-                    V2211 = (
-                        V2211
-                        + TwoE_int(
-                            Exp_He1s[i],
-                            Exp_He1s[j],
-                            Exp_H1s[k],
-                            Exp_H1s[l],
-                            0.0,
-                            0.0,
-                            R2,
-                        )
-                        * Coe_He1s[i]
-                        * Coe_He1s[j]
-                        * Coe_H1s[k]
-                        * Coe_H1s[l]
-                    )
-                    V2221 = (
-                        V2221
-                        + TwoE_int(
-                            Exp_He1s[i],
-                            Exp_He1s[j],
-                            Exp_He1s[k],
-                            Exp_H1s[l],
-                            0.0,
-                            R2,
-                            R2_bq,
-                        )
-                        * Coe_He1s[i]
-                        * Coe_He1s[j]
-                        * Coe_He1s[k]
-                        * Coe_H1s[l]
-                    )
-                    V2222 = (
-                        V2222
-                        + TwoE_int(
-                            Exp_He1s[i],
-                            Exp_He1s[j],
-                            Exp_He1s[k],
-                            Exp_He1s[l],
-                            0.0,
-                            0.0,
-                            0.0,
-                        )
-                        * Coe_He1s[i]
-                        * Coe_He1s[j]
-                        * Coe_He1s[k]
-                        * Coe_He1s[l]
-                    )
+    # Classes with the same pair on both sides only visit (ij) >= (kl) using (ij|kl) = (kl|ij)
+    M = P_HH.shape[0]
+    NN = P_HeH.shape[0]
+    for ij in range(M):
+        for kl in range(ij + 1):
+            W = 1.0 if ij == kl else 2.0
+            V1111 += W * TwoE_int_Pair(P_HH[ij], P_HH[kl], D_HH[ij] * D_HH[kl], 0.0)
+            V2222 += W * TwoE_int_Pair(
+                P_HeHe[ij], P_HeHe[kl], D_HeHe[ij] * D_HeHe[kl], 0.0
+            )
+        for kl in range(M):
+            V2211 += TwoE_int_Pair(P_HeHe[ij], P_HH[kl], D_HeHe[ij] * D_HH[kl], R2)
+
+    for ij in range(NN):
+        for kl in range(M):
+            V2111 += TwoE_int_Pair(
+                P_HeH[ij], P_HH[kl], D_HeH[ij] * D_HH[kl], R_pH[ij] * R_pH[ij]
+            )
+            R_pHe = R - R_pH[ij]
+            V2221 += TwoE_int_Pair(
+                P_HeHe[kl], P_HeH[ij], D_HeHe[kl] * D_HeH[ij], R_pHe * R_pHe
+            )
+        for kl in range(ij + 1):
+            W = 1.0 if ij == kl else 2.0
+            R_pq = R_pH[ij] - R_pH[kl]
+            V2121 += W * TwoE_int_Pair(
+                P_HeH[ij], P_HeH[kl], D_HeH[ij] * D_HeH[kl], R_pq * R_pq
+            )
 
     return (
         S12,
@@ -394,6 +365,36 @@ def AO_Integral(N, R, Zeta1, Zeta2, Z_H, Z_He):
     )
 
 
+def ERI_Index(i, j, k, l):
+    """
+    Position of (ij|kl) among the unique two-electron integrals V1111, V2111, V2121, V2211, V2221, V2222
+    """
+    ## (ij|kl) = (ji|kl) = (ij|lk) = (kl|ij), so the canonical pairs ij >= kl with i >= j
+    # and k >= l label all unique integrals
+    ij = max(i, j) * (max(i, j) + 1) // 2 + min(i, j)
+    kl = max(k, l) * (max(k, l) + 1) // 2 + min(k, l)
+    return max(ij, kl) * (max(ij, kl) + 1) // 2 + min(ij, kl)
+
+
+# Lookup table of ERI_Index for all elements of the 4-rank tensor V(2,2,2,2)
+ERI_INDEX = np.array(
+    [
+        [
+            [[ERI_Index(i, j, k, l) for l in range(2)] for k in range(2)]
+            for j in range(2)
+        ]
+        for i in range(2)
+    ]
+)
+
+
+def Unpack_ERI(V):
+    """
+    Expand the packed unique two-electron integrals to the 4-rank tensor V(2,2,2,2)
+    """
+    return V[ERI_INDEX]
+
+
 ### Construct the Hamiltonian which is the summation of all integrals, and the overlap matrix
 ### Since the global variables use several arguments in the construction of AOs, we need to have them all in Hamiltonian
 
@@ -418,49 +419,24 @@ def Collect(
 ):
     """
     This function will compute the core Hamiltonian H, overlap matrix S, and S^-1/2
-    Construct the 4-rank tensor of two-electron integrals
+    Pack the unique two-electron integrals in the order given by ERI_Index
     """
 
     # Construct the core Hamiltonian elements; the Hamiltonian Matrix is declared and initialized outside
     # the function Ham; the same for other matrices
-    H = np.zeros((2, 2))
-    H[0, 0] = T11 + V11H + V11He
-    H[0, 1] = T12 + V12H + V12He
-    H[1, 0] = H[0, 1]
-    H[1, 1] = T22 + V22H + V22He
+    H12 = T12 + V12H + V12He
+    H = np.array([[T11 + V11H + V11He, H12], [H12, T22 + V22H + V22He]])
 
     # Construct the overlap matrix
-    S = np.zeros((2, 2))
-    S[0, 0] = 1
-    S[0, 1] = S12
-    S[1, 0] = S12
-    S[1, 1] = 1
+    S = np.array([[1.0, S12], [S12, 1.0]])
 
     # Construct S^-/2 using Canonical Orthogonalization
-    X = np.zeros((2, 2))
-    X[0, 0] = 1.0 / np.sqrt(2.0 * (1.0 + S12))
-    X[0, 1] = X[0, 0]
-    X[0, 1] = 1.0 / np.sqrt(2.0 * (1.0 - S12))
-    X[1, 1] = -X[0, 1]
-
-    # Convert two-electron integrals to elements of a 4-rank tensor of V(2,2,2,2)
-    V = np.zeros((2, 2, 2, 2))
-    V[0, 0, 0, 0] = V1111
-    V[0, 0, 0, 1] = V2111
-    V[0, 0, 1, 0] = V2111
-    V[0, 0, 1, 1] = V2211
-    V[0, 1, 0, 0] = V2111
-    V[0, 1, 0, 1] = V2121
-    V[0, 1, 1, 0] = V2121
-    V[0, 1, 1, 1] = V2221
-    V[1, 0, 0, 0] = V2111
-    V[1, 0, 0, 1] = V2121
-    V[1, 0, 1, 0] = V2121
-    V[1, 0, 1, 1] = V2221
-    V[1, 1, 0, 0] = V2211
-    V[1, 1, 0, 1] = V2221
-    V[1, 1, 1, 0] = V2221
-    V[1, 1, 1, 1] = V2222
+    X11 = 1.0 / math.sqrt(2.0 * (1.0 + S12))
+    X12 = 1.0 / math.sqrt(2.0 * (1.0 - S12))
+    X = np.array([[X11, X12], [X11, -X12]])
+
+    # Only the 6 unique two-electron integrals are kept; use Unpack_ERI to obtain V(2,2,2,2)
+    V = np.array([V1111, V2111, V2121, V2211, V2221, V2222])
 
     return H, S, X, V
 
@@ -468,134 +444,189 @@ def Collect(
 ############ Implement SCF procedure  ############
 
 
-def SCF(H, X, Z_H, Z_He, R, V):
+@njit(
+    "float64[:, :](float64[:, :], float64[:, :])",
+    cache=True,
+    fastmath=True,
+    boundscheck=False,
+)
+def MatMul_2x2(A, B):
+    """
+    Multiply two 2x2 matrices with the products written out
+    """
+    C = np.empty((2, 2))
+    C[0, 0] = A[0, 0] * B[0, 0] + A[0, 1] * B[1, 0]
+    C[0, 1] = A[0, 0] * B[0, 1] + A[0, 1] * B[1, 1]
+    C[1, 0] = A[1, 0] * B[0, 0] + A[1, 1] * B[1, 0]
+    C[1, 1] = A[1, 0] * B[0, 1] + A[1, 1] * B[1, 1]
+    return C
+
+
+@njit(
+    "float64[:, :](float64[:, :], float64[:, :])",
+    cache=True,
+    fastmath=True,
+    boundscheck=False,
+)
+def Transform_2x2(X, F):
+    """
+    Calculate X.T * F * X for 2x2 matrices without forming X.T
+    """
+    ## G = F * X holds the intermediate product
+    G00 = F[0, 0] * X[0, 0] + F[0, 1] * X[1, 0]
+    G01 = F[0, 0] * X[0, 1] + F[0, 1] * X[1, 1]
+    G10 = F[1, 0] * X[0, 0] + F[1, 1] * X[1, 0]
+    G11 = F[1, 0] * X[0, 1] + F[1, 1] * X[1, 1]
+
+    Fprime = np.empty((2, 2))
+    Fprime[0, 0] = X[0, 0] * G00 + X[1, 0] * G10
+    Fprime[0, 1] = X[0, 0] * G01 + X[1, 0] * G11
+    Fprime[1, 0] = X[0, 1] * G00 + X[1, 1] * G10
+    Fprime[1, 1] = X[0, 1] * G01 + X[1, 1] * G11
+    return Fprime
+
+
+@njit(
+    "float64(float64[:, :], float64[:, :])",
+    cache=True,
+    fastmath=True,
+    boundscheck=False,
+)
+def Delta_2x2(P, OldP):
+    """
+    Calculate the root mean square change between two 2x2 density matrices
+    """
+    ## The squared differences are summed explicitly on plain floats, so no temporary
+    # arrays or NumPy scalars are created in the SCF loop
+    return math.sqrt(
+        (
+            (P[0, 0] - OldP[0, 0]) * (P[0, 0] - OldP[0, 0])
+            + (P[0, 1] - OldP[0, 1]) * (P[0, 1] - OldP[0, 1])
+            + (P[1, 0] - OldP[1, 0]) * (P[1, 0] - OldP[1, 0])
+            + (P[1, 1] - OldP[1, 1]) * (P[1, 1] - OldP[1, 1])
+        )
+        * 0.25
+    )
+
+
+def SCF(H, X, Z_H, Z_He, R, V, verbose=False, quiet=False):
     """
-    Implement SCF iterations
+    Implement SCF iterations and return the total energy (nan if not converged)
     """
+    ## The output is collected in log and printed once the SCF loop has finished;
+    # the report of every iteration is only added with verbose=True, and quiet=True
+    # prints nothing
+    log = []
     Crit = 1e-15  # Convergence threshold
     Maxit = 250  # Maximum number of iteration
     Iter = 0  # Count number of iteration
+    EnergyTotal = math.nan
 
     ## Step 1: Guess the initial density matrix P ##
     # P is a matrix of zeros, so the Fock matrix F will be the core Hamiltonian only
     P = np.zeros([2, 2])
 
+    # Expand the packed two-electron integrals V and combine the Coulomb and exchange
+    # integrals once, they do not change during the SCF
+    V4 = Unpack_ERI(V)
+    VJK = V4 - 0.5 * V4.transpose(0, 3, 2, 1)
+
     while Iter <= Maxit:
-        print("  ")
         Iter += 1
-        print("Interation number: {:03d}".format(Iter))
+        if verbose:
+            log.append("  ")
+            log.append(f"Interation number: {Iter:03d}")
 
         ######### Step 2: Calculate the Fock matrix ######
         ### Calculate two-electron part of the Fock matrix from the density matrix P
-        G = np.zeros([2, 2])
-
-        for i in range(2):
-            for j in range(2):
-                for k in range(2):
-                    for l in range(2):
-                        G[i, j] += P[k, l] * (V[i, j, k, l] - 0.5 * V[i, l, k, j])
+        # G[i,j] = sum over k,l of P[k,l] * (V[i,j,k,l] - 0.5*V[i,l,k,j])
+        G = np.einsum("kl,ijkl->ij", P, VJK)
 
         ### Combine the core Hamiltonian with G to obtain the Fock matrix
 
         F = H + G
 
         ### Calculate the electronic energy
-        Energy = 0.0
-        for i in range(2):
-            for j in range(2):
-                Energy += 0.5 * P[i, j] * (H[i, j] + F[i, j])
-
-        # Energy2 = 0.0
-        # Energy2 += np.sum(0.5*P*(H+F))
+        Energy = 0.5 * np.sum(P * (H + F)).item()
 
-        print("Electronic energy = ", Energy)
-        # print('Electronic energy calculated py numpy.sum = ', Energy2)
+        if verbose:
+            log.append(f"Electronic energy =  {Energy}")
 
         ####### Step 3: calculate Fprime by using S^-1/2 (X in the code), and S^1/2 (X.T in the code)
-        G = np.matmul(F, X)
-        Fprime = np.matmul(X.T, G)
+        Fprime = Transform_2x2(X, F)
 
         ##### Step 4: Diagonalize the Fock matrix. This will produce Cprime and eigen values E
         # Diagonalization of Fock matrix
         Cprime, E = Diag(Fprime)
-        print("                                   ")
-        print("Eigen values of the Fock Operators:")
-        print(E)
-        print("                                   ")
-        print("-----------------------------------")
-        print("-----------------------------------")
+        if verbose:
+            log.append("                                   ")
+            log.append("Eigen values of the Fock Operators:")
+            log.append(str(E))
+            log.append("                                   ")
+            log.append("-----------------------------------")
+            log.append("-----------------------------------")
 
         #### Step 5: Calculate orbital coefficients #######
-        C = np.matmul(X, Cprime)
+        C = MatMul_2x2(X, Cprime)
 
         #### Step 6: Calculate the new density matrix #####
-        OldP = np.array(P)
-        P = np.zeros((2, 2))
-        # Generate new elements of density matrix
-        for i in range(2):
-            for j in range(2):
-                P[i, j] = 0.0
-                # Calculate new elements on the basis of new C
-                for k in range(1):
-                    P[i, j] = P[i, j] + 2.0 * C[i, k] * C[k, j]
+        OldP = P.copy()
+        # Generate new elements of density matrix from the doubly occupied orbital (first column of C)
+        P = 2.0 * np.outer(C[:, 0], C[:, 0])
 
         # Check convergence using density matrix
-        Delta = P - OldP
-        Delta = np.sqrt(np.sum(Delta ** 2) / 4.0)
+        Delta = Delta_2x2(P, OldP)
         if Delta < Crit:
             EnergyTotal = Energy + Z_H * Z_He / R
-            print("             ")
-            print("Calculation converged")
-            print("   ")
-            print("Electronic energy =", Energy)
-            print("Total energy =", EnergyTotal)
-            print("   ")
-            print("Happy landing")
+            log.append("             ")
+            log.append("Calculation converged")
+            log.append("   ")
+            log.append(f"Electronic energy = {Energy}")
+            log.append(f"Total energy = {EnergyTotal}")
+            log.append("   ")
+            log.append("Happy landing")
             break
         elif Iter >= Maxit:
-            print("Not converged")
+            log.append("Not converged")
             break
 
+    if not quiet:
+        print("\n".join(log))
+    return EnergyTotal
 
+
+@njit(
+    "UniTuple(float64[:, :], 2)(float64[:, :])",
+    cache=True,
+    fastmath=True,
+    boundscheck=False,
+)
 def Diag(Fprime):
     """
-    This function is to diagonalize symmetric matrices using the Jacobi algorithm
+    This function is to diagonalize symmetric 2x2 matrices using a single Jacobi rotation
     Diagonalization will give the matrix of coefficients Cprime and energy of Orbitals E (eigen values)
     """
-    if abs(Fprime[0, 0] - Fprime[1, 1]) > 1.0e-20:
-        TheTa = 0.5 * math.atan(2.0 * Fprime[0, 1] / (Fprime[0, 0] - Fprime[1, 1]))
-    else:
-        TheTa = math.pi / 4.0
+    # atan2 picks the rotation angle for which (cos, sin) is the eigen vector of the
+    # higher eigen value, also when Fprime[0,0] = Fprime[1,1]
+    TheTa = 0.5 * math.atan2(2.0 * Fprime[0, 1], Fprime[0, 0] - Fprime[1, 1])
+    c = math.cos(TheTa)
+    s = math.sin(TheTa)
+
+    # Eigen values in ascending order from the trace and the half splitting; hypot avoids
+    # the cancellation of Tr^2/4 - Det for nearly degenerate diagonal elements
+    Tr = Fprime[0, 0] + Fprime[1, 1]
+    Disc = math.hypot(0.5 * (Fprime[0, 0] - Fprime[1, 1]), Fprime[0, 1])
 
     Cprime = np.zeros((2, 2))
     E = np.zeros((2, 2))
-    Cprime[0, 0] = math.cos(TheTa)
-    Cprime[1, 0] = math.sin(TheTa)
-    Cprime[0, 1] = math.sin(TheTa)
-    Cprime[1, 1] = -math.cos(TheTa)
-
-    E[0, 0] = (
-        Fprime[0, 0] * math.cos(TheTa) ** 2
-        + Fprime[1, 1] * math.sin(TheTa) ** 2
-        + Fprime[0, 1] * math.sin(2.0 * TheTa)
-    )
-    E[1, 1] = (
-        Fprime[1, 1] * math.cos(TheTa) ** 2
-        + Fprime[0, 0] * math.sin(TheTa) ** 2
-        + Fprime[0, 1] * math.sin(2.0 * TheTa)
-    )
-    E[1, 0] = 0.0
-    E[0, 1] = 0.0
-
-    # Order eigen values E and eigen vectors Cprime
-    if E[1, 1] <= E[0, 0]:
-        Temp = E[0, 0]
-        E[0, 0] = E[1, 1]
-        E[1, 1] = Temp
+    E[0, 0] = 0.5 * Tr - Disc
+    E[1, 1] = 0.5 * Tr + Disc
 
-        Temp = Cprime[0, 0]
-        Cprime[0, 0] = Cprime[1, 1]
-        Cprime[1, 1] = Temp
+    # Eigen vectors ordered as the eigen values
+    Cprime[0, 0] = s
+    Cprime[1, 0] = -c
+    Cprime[0, 1] = c
+    Cprime[1, 1] = s
 
     return Cprime, E
 
@@ -603,11 +634,13 @@ def Diag(Fprime):
 ##### HF calculation ####
 
 
-def HFCALC(N, R, Zeta1, Zeta2, Z_H, Z_He):
+def HFCALC(N, R, Zeta1, Zeta2, Z_H, Z_He, verbose=False, quiet=False):
     """
-    Perform the Hartree-Fock calculations
+    Perform the Hartree-Fock calculations and return the total energy
     """
-    print("Hartree-Fock calculation uses STO-%dG for H and He" % N)
+    ## verbose=True prints the report of every SCF iteration; quiet=True prints nothing
+    if not quiet:
+        print("Hartree-Fock calculation uses STO-%dG for H and He" % N)
     (
         S12,
         T11,
@@ -625,7 +658,7 @@ def HFCALC(N, R, Zeta1, Zeta2, Z_H, Z_He):
         V2211,
         V2221,
         V2222,
-    ) = AO_Integral(N, R, Zeta1, Z_H, Z_H, Z_He)
+    ) = AO_Integral(N, R, Zeta1, Zeta2, Z_H, Z_He)
 
     H, S, X, V = Collect(
         S12,
@@ -647,7 +680,36 @@ def HFCALC(N, R, Zeta1, Zeta2, Z_H, Z_He):
     )
 
     # Do the calculation
-    SCF(H, X, Z_H, Z_He, R, V)
+    return SCF(H, X, Z_H, Z_He, R, V, verbose, quiet)
+
+
+##### Potential energy surface scan ####
+
+
+def PES_SCAN(N, R_array, Zeta1, Zeta2, Z_H, Z_He, max_workers=None):
+    """
+    Perform the Hartree-Fock calculations for all bond distances in R_array in parallel
+    """
+    ## The geometries are independent, so each one is computed by HFCALC in a separate
+    # process without printing; max_workers defaults to the number of processors
+    # One geometry takes well under a millisecond, so the distances are sent to the
+    # workers in chunks (about 4 per worker) instead of one inter-process call each
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    chunksize = max(1, math.ceil(len(R_array) / (4 * max_workers)))
+    Calc = partial(HFCALC, verbose=False, quiet=True)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        Energies = executor.map(
+            Calc,
+            repeat(N),
+            R_array,
+            repeat(Zeta1),
+            repeat(Zeta2),
+            repeat(Z_H),
+            repeat(Z_He),
+            chunksize=chunksize,
+        )
+        return np.array(list(Energies))
 
 
 # Call the main program